@@ -9,15 +9,16 @@ Supports two formats:
 Usage:
   python3 multi_plot_auto.py --file fort.10 --time_ps 10    --xunit cm --out rho_10ps.pdf
   python3 multi_plot_auto.py --file fort.10 --frame 0       --xunit cm --out rho_t0.pdf
+  python3 multi_plot_auto.py --file fort.10 --batch --frames-range 0:40:5 --out rho.pdf   # rho_0000.pdf, rho_0005.pdf, ...
 Options:
   --smooth K   optional boxcar smoothing over K cells
 """
 
-import argparse, re, io
+import argparse, re, io, os, mmap
 import numpy as np
 import matplotlib
 matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure  # no pyplot: batch output only, no figure registry
 import matplotlib as mpl
 mpl.rcParams["pdf.fonttype"] = 42
 mpl.rcParams["ps.fonttype"]  = 42
@@ -35,65 +36,96 @@ def unit_factor_to_um(xunit: str) -> float:
 
 def boxcar(y: np.ndarray, k: int) -> np.ndarray:
     if k is None or k <= 1: return y
-    kernel = np.ones(int(k), dtype=float)/int(k)
-    return np.convolve(y, kernel, mode="same")
+    # O(N) running-sum average; matches np.convolve(y, ones(k)/k, mode="same")
+    k, n = int(k), len(y)
+    c = np.concatenate(([0.0], np.cumsum(y, dtype=float)))
+    i = np.arange(n)
+    lo = np.clip(i - k//2, 0, n)
+    hi = np.clip(i + (k-1)//2 + 1, 0, n)
+    return (c[hi] - c[lo]) / k
+
+def frames_range(spec: str) -> slice:
+    try:
+        parts = [int(p) if p.strip() else None for p in spec.split(":")]
+    except ValueError:
+        parts = []
+    if not 1 <= len(parts) <= 3:
+        raise SystemExit(f"Bad --frames-range '{spec}'. Use: START:STOP[:STEP]")
+    if len(parts) == 1:
+        return slice(parts[0], None if parts[0] == -1 else parts[0] + 1)
+    return slice(*parts)
+
+def frame_out_path(out: str, i: int) -> str:
+    root, ext = os.path.splitext(out)
+    return f"{root}_{i:04d}{ext}"
 
 # ------------------------------
 # Format B: Block ASCII parser
 # ------------------------------
 
-BLOCK_START_RE = re.compile(r"\bstep\s*=\s*(\d+)\s+time\s*=\s*([Ee0-9\+\-\.]+)", re.IGNORECASE)
-HEADER_RE = re.compile(r"\s*i\s+x\s+v\s+rho\s+te\s+ti\s+depo", re.IGNORECASE)
+BLOCK_START_RE = re.compile(rb"\bstep\s*=\s*(\d+)\s+time\s*=\s*([Ee0-9\+\-\.]+)", re.IGNORECASE | re.ASCII)
+HEADER_RE = re.compile(rb"\s*i\s+x\s+v\s+rho\s+te\s+ti\s+depo", re.IGNORECASE | re.ASCII)
+# Fortran drops the exponent letter of 3-digit exponents: 0.270627-101
+DROPPED_E_RE = re.compile(rb"(\d)([+-]\d{3})(?![\d.])")
 
-def parse_block_ascii(stream: io.TextIOBase):
+def _rows_to_array(rows):
     """
-    Parse block-style fort.10 into list of blocks:
-      {"step": int, "time_s": float, "data": np.ndarray (N,7)}
+    Bulk-parse the buffered 7-column rows of one block in a single call.
+    Falls back to per-row parsing (dropping bad rows) if a value does not parse.
     """
-    blocks, cur = [], None
-    for raw in stream:
-        m = BLOCK_START_RE.search(raw)
-        if m:
-            # flush previous block
-            if cur and cur.get("rows"):
-                cur["data"] = np.array(cur["rows"], dtype=float)
-                cur.pop("rows")
-                blocks.append(cur)
-            cur = {"step": int(m.group(1)), "time_s": float(m.group(2)), "rows": []}
-            continue
-        if cur is None:
-            continue
-        if HEADER_RE.search(raw):
-            # header line; ignore
-            continue
-        parts = raw.strip().split()
-        if len(parts) == 7 and parts[0].lstrip("+-").replace(".","",1).isdigit() is False:
-            # some files have i as integer; but we won't over-validate here
-            pass
-        if len(parts) == 7:
+    try:
+        return np.loadtxt(io.BytesIO(b"\n".join(rows)), dtype=np.float64, ndmin=2)
+    except ValueError:
+        good = []
+        for raw in rows:
             try:
-                row = [float(p) for p in parts]
-                cur["rows"].append(row)
+                good.append([float(p) for p in raw.split()])
             except ValueError:
                 pass
-    if cur and cur.get("rows"):
-        cur["data"] = np.array(cur["rows"], dtype=float)
-        cur.pop("rows")
-        blocks.append(cur)
-    if not blocks:
+        return np.array(good, dtype=float)
+
+def parse_block_ascii(path):
+    """
+    Parse block-style fort.10 into parallel per-block arrays:
+      {"step": np.ndarray (Nb,), "time_s": np.ndarray (Nb,), "data": [np.ndarray (N,7), ...]}
+    The file is memory-mapped and block headers are located with one regex scan.
+    """
+    steps, times, datas = [], [], []
+    if os.path.getsize(path) == 0:
+        raise ValueError("No block-ascii data found")
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        starts = list(BLOCK_START_RE.finditer(mm))
+        for k, m in enumerate(starts):
+            lo = m.end()
+            hi = starts[k+1].start() if k+1 < len(starts) else len(mm)
+            h = HEADER_RE.search(mm, lo, hi)
+            if h:
+                # header line; ignore
+                lo = h.end()
+            block = DROPPED_E_RE.sub(rb"\1E\2", mm[lo:hi])
+            rows = [ln for ln in block.split(b"\n") if len(ln.split()) == 7]
+            if not rows:
+                continue
+            data = _rows_to_array(rows)
+            if len(data):
+                steps.append(int(m.group(1)))
+                times.append(float(m.group(2)))
+                datas.append(data)
+    if not datas:
         raise ValueError("No block-ascii data found")
-    return blocks
+    return {"step": np.array(steps, dtype=int), "time_s": np.array(times, dtype=float), "data": datas}
 
 def pick_block(blocks, frame=None, time_ps=None):
+    n = len(blocks["data"])
     if frame is not None:
-        i = int(np.clip(int(frame), 0, len(blocks)-1))
-        return blocks[i], i
-    if time_ps is not None:
+        i = int(np.clip(int(frame), 0, n-1))
+    elif time_ps is not None:
         target = float(time_ps) * 1e-12
-        times = np.array([b["time_s"] for b in blocks])
-        i = int(np.abs(times - target).argmin())
-        return blocks[i], i
-    return blocks[-1], len(blocks)-1
+        i = int(np.abs(blocks["time_s"] - target).argmin())
+    else:
+        i = n-1
+    blk = {"step": int(blocks["step"][i]), "time_s": float(blocks["time_s"][i]), "data": blocks["data"][i]}
+    return blk, i
 
 # ------------------------------
 # Format A: Classic fort.10 parser (robust to compact/expanded headers)
@@ -102,25 +134,25 @@ def pick_block(blocks, frame=None, time_ps=None):
 def _read_exact_names(fp, nfields):
     names = []
     while len(names) < nfields:
-        line = fp.readline()
+        line = fp.readline().decode("ascii", "ignore")
         if not line: raise EOFError("EOF while reading names")
         chunks = [line[i:i+8] for i in range(0, len(line.rstrip("\n")), 8)]
         names.extend([c.strip() for c in chunks if c.strip()])
     return names[:nfields]
 
 def _read_exact_ints(fp, nfields):
-    vals = []
-    while len(vals) < nfields:
+    toks = []
+    while len(toks) < nfields:
         line = fp.readline()
         if not line: raise EOFError("EOF while reading indices")
-        for tok in line.strip().replace(",", " ").split():
-            vals.append(int(tok))
-    return vals[:nfields]
+        toks.extend(line.replace(b",", b" ").split())
+    # same bulk conversion as _read_values
+    return np.array(toks[:nfields], dtype=np.int64).tolist()
 
 def _read_section_header(fp):
     line = fp.readline()
     if not line: raise EOFError("EOF reading section count")
-    n_tokens = int(line.strip().split()[0])
+    n_tokens = int(line.split()[0])
     names = _read_exact_names(fp, n_tokens)
     lens  = _read_exact_ints(fp, n_tokens)
     if len(names) != len(lens):
@@ -143,43 +175,35 @@ def _read_section_header(fp):
     return {"items": items, "total_values": total_values}
 
 def _read_values(fp, nvals):
-    vals = []
-    while len(vals) < nvals:
+    toks = []
+    while len(toks) < nvals:
         line = fp.readline()
         if not line: raise EOFError("EOF while reading values")
-        vals.extend([float(t) for t in line.strip().split()])
-    return vals[:nvals]
+        toks.extend(line.split())
+    # one C-level conversion per record instead of a float() per token
+    return np.array(toks[:nvals], dtype=np.float64)
 
 def _skip_static(fp):
     meta = _read_section_header(fp)
     _ = _read_values(fp, meta["total_values"])
 
 def read_classic_fort10(path):
-    with open(path, "r") as fp:
+    # binary: only the small header lines are decoded, the float region never is
+    with open(path, "rb", buffering=1 << 20) as fp:
         _skip_static(fp)
         dyn = _read_section_header(fp)
         rec_n = dyn["total_values"]
         items = dyn["items"]
-        data = {name: [] for name,_ in items}
-        while True:
-            pos = fp.tell()
-            line = fp.readline()
-            if not line: break
-            fp.seek(pos)
-            try:
-                vals = _read_values(fp, rec_n)
-            except EOFError:
-                break
-            cur = 0
-            for name, L in items:
-                if L == 0:
-                    data[name].append(vals[cur]); cur += 1
-                else:
-                    data[name].append(vals[cur:cur+L]); cur += L
-    out = {}
-    for k, seq in data.items():
-        arr = np.array(seq, dtype=float)
-        out[k] = arr if arr.ndim > 1 else arr.astype(float)
+        # the dynamic region is nothing but whitespace-separated floats: parse it in one go
+        vals = np.array(fp.read().split(), dtype=np.float64)
+    # one row per frame (a truncated trailing frame is dropped)
+    frames = vals[:vals.size - vals.size % rec_n].reshape(-1, rec_n)
+    out, cur = {}, 0
+    for name, L in items:
+        if L == 0:
+            out[name] = frames[:, cur]; cur += 1
+        else:
+            out[name] = frames[:, cur:cur+L]; cur += L
     return out  # expects keys TIME (s), R (Nt,N), XC (Nt,N)
 
 # ------------------------------
@@ -189,6 +213,24 @@ def read_classic_fort10(path):
 def is_block_ascii_head(sample: str) -> bool:
     return ("step=" in sample.lower() and "time=" in sample.lower()) or ("ascii_ouput" in sample.lower())
 
+def sort_and_smooth(x_um, rho, k):
+    # Sort (cells are normally already ordered) and optionally smooth
+    if not np.all(np.diff(x_um) >= 0):
+        order = np.argsort(x_um)
+        x_um = x_um[order]
+        rho  = rho[order]
+    return x_um, boxcar(rho, k)
+
+def plot_frame(ax, x_um, rho, title, out):
+    ax.cla()
+    ax.plot(x_um, rho, lw=1.8)
+    ax.set_xlabel("distance [μm]")
+    ax.set_ylabel("density [g/cc]")
+    ax.set_title(title)
+    ax.grid(True, alpha=0.3)
+    ax.figure.tight_layout()
+    ax.figure.savefig(out)
+
 def main():
     ap = argparse.ArgumentParser(description="Plot ρ(x) at one time from fort.10 (auto-detect format).")
     ap.add_argument("--file","-f", default="fort.10")
@@ -198,24 +240,25 @@ def main():
     ap.add_argument("--out","-o", default="density_profile.pdf")
     ap.add_argument("--smooth", type=int, default=1, help="Boxcar smooth over K cells")
     ap.add_argument("--title", default=None)
+    ap.add_argument("--batch", action="store_true", help="Write every frame (or --frames-range) reusing one figure")
+    ap.add_argument("--frames-range", default=None, help="Frames for --batch as START:STOP[:STEP] (0-based, implies --batch)")
     args = ap.parse_args()
 
     # Peek at the file to choose parser
-    with open(args.file, "r") as f:
-        sample = f.read(4096)
+    with open(args.file, "rb") as f:
+        sample = f.read(4096).decode("ascii", "ignore")
 
     if is_block_ascii_head(sample):
         # -------- Block ASCII fort.10 --------
-        with open(args.file, "r") as f:
-            blocks = parse_block_ascii(f)
+        blocks = parse_block_ascii(args.file)
         blk, idx = pick_block(blocks, frame=args.frame, time_ps=args.time_ps)
-        data = blk["data"]  # columns: i x v rho te ti depo
-        if data.shape[1] < 4:
+        if blk["data"].shape[1] < 4:
             raise SystemExit("Expected at least 7 columns: i x v rho te ti depo.")
-        x = data[:,1]
-        rho = data[:,3]
-        t_ps = blk["time_s"] * 1e12
-        x_um = x * unit_factor_to_um(args.xunit)
+        nframes = len(blocks["data"])
+        fx = unit_factor_to_um(args.xunit)
+        def profile(i):
+            data = blocks["data"][i]  # columns: i x v rho te ti depo
+            return data[:,1] * fx, data[:,3], blocks["time_s"][i] * 1e12
     else:
         # -------- Classic fort.10 --------
         dyn = read_classic_fort10(args.file)
@@ -226,6 +269,7 @@ def main():
         R  = np.asarray(dyn["R"])      # (Nt,N) g/cc
         XC = np.asarray(dyn["XC"])     # (Nt,N) cm
         Nt, N = R.shape
+        nframes = Nt
         if args.frame is not None:
             idx = int(np.clip(args.frame, 0, Nt-1))
         elif args.time_ps is not None:
@@ -233,27 +277,25 @@ def main():
             idx = int(np.abs(t - target).argmin())
         else:
             idx = Nt-1
-        x_um = XC[idx] * 1e4  # cm -> μm (classic)
-        rho  = R[idx]
-        t_ps = t[idx] * 1e12
+        def profile(i):
+            return XC[i] * 1e4, R[i], t[i] * 1e12  # cm -> μm (classic)
 
-    # Sort and optionally smooth
-    order = np.argsort(x_um)
-    x_um = x_um[order]
-    rho  = rho[order]
-    rho  = boxcar(rho, args.smooth)
+    batch = args.batch or args.frames_range is not None
+    if batch:
+        frames = range(nframes)[frames_range(args.frames_range or ":")]
+    else:
+        frames = [idx]
 
-    # Plot
-    plt.figure()
-    plt.plot(x_um, rho, lw=1.8)
-    plt.xlabel("distance [μm]")
-    plt.ylabel("density [g/cc]")
-    title = args.title or f"ρ(x) at t ≈ {t_ps:.3g} ps"
-    plt.title(title)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(args.out)
-    print(f"Wrote {args.out}  | frame={idx}  t≈{t_ps:.3g} ps")
+    # One figure for all frames; each frame only clears and redraws the axes
+    fig = Figure()
+    ax = fig.subplots()
+    for i in frames:
+        x_um, rho, t_ps = profile(i)
+        x_um, rho = sort_and_smooth(x_um, rho, args.smooth)
+        out = frame_out_path(args.out, i) if batch else args.out
+        title = args.title or f"ρ(x) at t ≈ {t_ps:.3g} ps"
+        plot_frame(ax, x_um, rho, title, out)
+        print(f"Wrote {out}  | frame={i}  t≈{t_ps:.3g} ps")
 
 if __name__ == "__main__":
     main()
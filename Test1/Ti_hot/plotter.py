@@ -1,45 +1,23 @@
 import sys
-import numpy as np
+from pathlib import Path
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repo root
+from fort_reader import read_step_columns
+
 #OPEN FILE
 if len(sys.argv) < 2:
     filename = "fort.11"
 else:
     filename = sys.argv[1]
-time = None
 step = 5
-step_r = None
 
 #ITERATE
-rows = []
-with open(filename, "r", encoding="utf-8", errors="ignore") as f:
-    for line in f:
-        s = line.strip()
-        if not s:
-            if rows: break
-            continue
-        parts = s.split()
-        if len(parts) == 4:
-             time = parts[3]
-             step_r = parts[1]
-        elif step_r != None:
-             if int(step_r) != step: continue
-        try:
-            nums = [float(p) for p in parts]
-            if len(nums) < 6: continue
-            rows.append(nums)
-        except ValueError:
-            if rows: break
-
-if not rows:
-    raise SystemExit(f"No numeric data found in {filename}")
-
-#SORT DATA
-arr = np.array(rows)
 # Columns: 0:i, 1:x, 2:v, 3:rho, 4:te, 5:ti, 6:depo
-x   = arr[:, 1]
-rho = arr[:, 3]
+x, rho, time = read_step_columns(filename, step, xcol=1, ycol=3)
+if x is None:
+    raise SystemExit(f"No numeric data found in {filename}")
+step_r = step
 
 
 #PLOT
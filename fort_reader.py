@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Shared fort.11 (MULTI 'ascii_ouput') step reader used by the plotter scripts.
+
+Usage:
+  from fort_reader import read_step_columns
+  x, ti, time = read_step_columns("fort.11", step=193, xcol=1, ycol=5)
+
+Columns: 0:i, 1:x, 2:v, 3:rho, 4:te, 5:ti, 6:depo
+"""
+
+import io
+import re
+
+import numpy as np
+
+STEP_RE = re.compile(rb"\s*step=\s*(\d+)\s+time=\s*(\S+)")
+# Fortran drops the exponent letter of 3-digit exponents: 0.270627-101
+DROPPED_E_RE = re.compile(rb"(\d)([+-]\d{3})(?![\d.])")
+
+
+def find_step(f, step):
+    """
+    Scan a binary fort.11 stream for the data rows of `step`.
+    Returns (start, end, time) byte offsets and the header time string,
+    or (None, None, None) if the step is not in the file.
+    """
+    time = None
+    start = end = None
+    step_r = None
+    # Offsets are summed from line lengths rather than asked of f.tell()
+    nxt = 0
+    while True:
+        pos, line = nxt, f.readline()
+        nxt += len(line)
+        if not line:
+            end = pos
+            break
+        m = STEP_RE.match(line) if b"step=" in line[:16] else None
+        if m:
+            if start is not None:
+                end = pos
+                break
+            step_r = int(m.group(1))
+            if step_r == step:
+                time = m.group(2).decode()
+            continue
+        if step_r != step:
+            continue
+        if not line.lstrip()[:1].isdigit():
+            # blank or column-header line, no need to tokenize
+            if start is not None:
+                end = pos
+                break
+            continue
+        # the last row of a step is a short cell-boundary row
+        short = len(line.split()) < 6
+        if start is None:
+            if not short:
+                start = pos
+        elif short:
+            end = pos
+            break
+    if start is None:
+        return None, None, None
+    return start, end, time
+
+
+def read_step_columns(path, step, xcol=1, ycol=5):
+    """
+    Read two columns of one step of a fort.11 file.
+    Returns (x, y, time) with time as the header string, or (None, None, None).
+    """
+    with open(path, "rb", buffering=1 << 20) as f:
+        start, end, time = find_step(f, step)
+        if start is None:
+            return None, None, None
+        f.seek(start)
+        block = f.read(end - start)
+    block = DROPPED_E_RE.sub(rb"\1E\2", block)
+    # only the requested columns are converted
+    arr = np.loadtxt(io.BytesIO(block), usecols=(xcol, ycol), ndmin=2)
+    return arr[:, 0], arr[:, 1], time
@@ -2,22 +2,27 @@ import numpy as np
 import matplotlib.pyplot as plt
 import argparse
 
-def read_fort(filename):
+def read_fort(filename, usecols=None):
+    # usecols: only convert these columns (rows too short for them are skipped)
     data = []
-    with open(filename, "r") as f:
+    with open(filename, "r", buffering=1 << 20) as f:
         for line in f:
-            parts = line.strip().split()
+            parts = line.split()
             try:
-                row = [float(x) for x in parts]
+                if usecols is None:
+                    row = [float(x) for x in parts]
+                else:
+                    float(parts[0])  # header/label lines start with text
+                    row = [float(parts[c]) for c in usecols]
                 data.append(row)
-            except ValueError:
+            except (ValueError, IndexError):
                 continue
     return np.array(data)
 
 def plot_columns(filename, xcol=1, ycol=4):
-    data = read_fort(filename)
-    x = data[:, xcol]
-    y = data[:, ycol]
+    data = read_fort(filename, usecols=(xcol, ycol))
+    x = data[:, 0]
+    y = data[:, 1]
 
     plt.figure(figsize=(6,4))
     plt.plot(x, y, marker='o', linestyle='-')
@@ -1,43 +1,18 @@
 import sys
-import numpy as np
+from pathlib import Path
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repo root
+from fort_reader import read_step_columns
+
 # --- CONFIG ---
 filename = "fort.11"
 steps_to_plot = [31, 81, 183, 193]
 
 
 def read_step_data(filename, step):
-    time = None
-    rows = []
-    with open(filename, "r", encoding="utf-8", errors="ignore") as f:
-        step_r = None
-        for line in f:
-            s = line.strip()
-            if not s:
-                if rows: break
-                continue
-            parts = s.split()
-            if len(parts) == 4:
-                time = parts[3]
-                step_r = int(parts[1])
-            elif step_r is not None:
-                if step_r != step:
-                    continue
-            try:
-                nums = [float(p) for p in parts]
-                if len(nums) < 6: continue
-                if step_r == step:
-                    rows.append(nums)
-            except ValueError:
-                if rows: break
-    if not rows:
-        return None, None, None
-    arr = np.array(rows)
-# Columns: 0:i, 1:x, 2:v, 3:rho, 4:te, 5:ti, 6:depo
-    x = arr[:, 1]
-    y = arr[:, 5]
-    return x, y, time
+    # Columns: 0:i, 1:x, 2:v, 3:rho, 4:te, 5:ti, 6:depo
+    return read_step_columns(filename, step, xcol=1, ycol=5)
 
 # --- PLOT MULTIPLE STEPS ---
 plt.figure()
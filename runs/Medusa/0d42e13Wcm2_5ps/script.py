@@ -18,12 +18,7 @@ step = 73
 time_stamp = None #ps
 
 ### Array Definition - MULTI###
-i, pos, v, rho, te, ti, depo = [], [], [], [], [], [], []
-data = [i, pos, v, rho, te, ti, depo]
-
-### Array Definition - Medusa ###
-pos_med, rho_med, Te_med, Ti_med = [], [], [], []
-data_med = [pos_med, rho_med, Te_med, Ti_med]
+rows = [] #Token lists of the selected step, converted to one array after the scan
 
 # %% [markdown]
 # Select the variables you want to plot for fortran. 
@@ -36,8 +31,8 @@ data_med = [pos_med, rho_med, Te_med, Ti_med]
 # - 6 - Deposition (depo)
 
 # %%
-x = data[1]
-y = data[5]
+x_col = 1
+y_col = 5
 
 # %% [markdown]
 # Select the variables you want to plot for Medusa
@@ -47,27 +42,19 @@ y = data[5]
 # - 3 - Ionic Temperature (Ti)
 
 # %%
-x_med = data_med[0]
-y_med = data_med[3]
+x_med_col = 0
+y_med_col = 3
 
 # %% [markdown]
 # Medusa Data processing
 
 # %%
-with open(filename_med, "r", encoding="utf-8", errors="ignore") as f_med:
-    for line in f_med:
-        s = line.strip()
-        s = s.split()
-        try:
-            data_string_buffer = [float(n) for n in s]
-            if len(data_string_buffer) == len(data_med):
-                    for i in range(len(data_med)):
-                        data_med[i].append(data_string_buffer[i])
-        except:
-             continue
-        
-x_med = np.array(x_med)
-y_med = np.array(y_med)
+# One ndarray per column: 0:pos, 1:rho, 2:Te, 3:Ti
+data_med = np.loadtxt(filename_med, skiprows=1, unpack=True)
+pos_med, rho_med, Te_med, Ti_med = data_med
+
+x_med = data_med[x_med_col]
+y_med = data_med[y_med_col]
 
 # %% [markdown]
 # Data processing for fort.11 files.
@@ -78,10 +65,11 @@ step_buffer = None
 time_stamp_buffer = None
 collect_status = False
 
-with open(filename, "r", encoding="utf-8", errors="ignore") as f:
+with open(filename, "r", encoding="utf-8", errors="ignore", buffering=1 << 20) as f:
     for line in f:
-        s = line.strip()
-        s = s.split()
+        if not collect_status and "step=" not in line[:16]: #Skips rows of other steps without tokenizing
+            continue
+        s = line.split()
         if not s: #Checks if line is blank
             continue
         if s[0] == "step=":
@@ -102,13 +90,24 @@ with open(filename, "r", encoding="utf-8", errors="ignore") as f:
                 else:
                     collect_status = False
         elif collect_status == True:
-            try:
-                data_string_buffer = [float(n) for n in s]
-                if len(data_string_buffer) == len(data):
-                    for i in range(len(data)):
-                        data[i].append(data_string_buffer[i])
-            except:
-                continue
+            if len(s) == 7:
+                rows.append(s)
+
+#Single (N, 7) conversion; rows with unparsable values are dropped
+try:
+    arr = np.array(rows, dtype=np.float64).reshape(-1, 7)
+except ValueError:
+    good = []
+    for r in rows:
+        try:
+            good.append([float(n) for n in r])
+        except ValueError:
+            continue
+    arr = np.array(good, dtype=np.float64).reshape(-1, 7)
+data = np.ascontiguousarray(arr.T) #One contiguous row per variable
+i, pos, v, rho, te, ti, depo = data
+x = data[x_col]
+y = data[y_col]
 
 #Plot
 x = np.array(x) * 1e4 #if x is position, we need to convert to um
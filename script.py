@@ -7,17 +7,72 @@ Usage examples:
   python plot_multi.py fort.10 profile TI
   python plot_multi.py fort.10 trace TI --cell 50
   python plot_multi.py fort.10 profile TE    # electrons
+
+The parsed arrays are cached in fort.10.cache.npz next to the input and
+reused while the file's size and mtime are unchanged (--no-cache to skip).
 """
 
 import argparse
-from collections import defaultdict, namedtuple
+from collections import namedtuple
+import io
+import mmap
+import os
 import sys
+import tempfile
+import zipfile
 
 import numpy as np
-import matplotlib.pyplot as plt
+# matplotlib is imported where it is used, so parsing (e.g. warming the
+# .cache.npz) does not pay for it
 
 Item = namedtuple("Item", ["name", "index"])
 
+class MappedFile:
+    """
+    Read-only mmap of a file with a minimal readline() cursor.
+    Lines are returned as bytes; pages are only loaded as they are touched.
+    `stat` is taken on the same fd just before mapping, so it never
+    describes more of the file than the map holds.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as fh:
+            self.stat = os.fstat(fh.fileno())
+            self.mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.pos = 0
+
+    def readline(self):
+        end = self.mm.find(b"\n", self.pos)
+        end = len(self.mm) if end < 0 else end + 1
+        line = self.mm[self.pos:end]
+        self.pos = end
+        return line
+
+    def read_lines(self, n):
+        # the next n lines as one bytes slice (shorter at EOF)
+        end = self.pos
+        for _ in range(n):
+            nl = self.mm.find(b"\n", end)
+            if nl < 0:
+                end = len(self.mm)
+                break
+            end = nl + 1
+        block = self.mm[self.pos:end]
+        self.pos = end
+        return block
+
+    def rest(self):
+        # everything from the cursor to EOF
+        return self.mm[self.pos:]
+
+    def close(self):
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 def read_int(f):
     line = f.readline()
     if not line:
@@ -31,25 +86,37 @@ def read_names(f, n):
         lbl = f.readline()
         if not lbl:
             raise EOFError("Unexpected EOF while reading names")
-        names.append(lbl.rstrip("\n"))
+        names.append(lbl.decode("ascii", "ignore").rstrip("\r\n"))
     return names
 
 def read_ints(f, n):
-    vals = []
-    for _ in range(n):
-        line = f.readline()
-        if not line:
-            raise EOFError("Unexpected EOF while reading indices")
-        vals.append(int(line.strip()))
+    # n lines, one int each, converted in a single call
+    vals = np.array(f.read_lines(n).split(), dtype=np.int64)
+    if vals.size < n:
+        raise EOFError("Unexpected EOF while reading indices")
     return vals
 
 def read_floats(f, n):
-    vals = []
-    for _ in range(n):
-        line = f.readline()
-        if not line:
-            raise EOFError("Unexpected EOF while reading values")
-        vals.append(float(line.strip()))
+    vals = parse_float_lines(f.read_lines(n))
+    if vals.size < n:
+        raise EOFError("Unexpected EOF while reading values")
+    return vals
+
+def parse_float_lines(buf, dtype=np.float64):
+    """
+    Parse a bytes buffer holding one float per line with numpy's C scanner.
+    Falls back to np.loadtxt (which reports the offending line) if the
+    number of values does not match the number of lines.
+    """
+    nlines = buf.count(b"\n") + (1 if buf and not buf.endswith(b"\n") else 0)
+    if not nlines or buf.isspace():
+        return np.empty(0, dtype=dtype)
+    try:
+        vals = np.fromstring(buf, dtype=dtype, sep=" ")
+    except ValueError:
+        vals = None
+    if vals is None or vals.size != nlines:
+        vals = np.loadtxt(io.BytesIO(buf), dtype=dtype, ndmin=1)
     return vals
 
 def group_structure(names, idxs):
@@ -57,157 +124,278 @@ def group_structure(names, idxs):
     Collapse repeated labels into variable groups.
     For scalars, idx == 0 and count == 1.
     For arrays, name repeats 'count' times and idx runs 1..count.
-    Returns dict: name -> {"count": m, "is_array": bool, "indices": list}
-    """
-    groups = defaultdict(lambda: {"count": 0, "indices": []})
-    for nm, ix in zip(names, idxs):
-        key = nm.strip()  # strip padding
-        g = groups[key]
-        g["count"] += 1
-        g["indices"].append(ix)
-    for key, g in groups.items():
-        g["is_array"] = (g["count"] > 1) or (g["indices"][0] != 0)
+    Returns dict: name -> {"count": m, "is_array": bool},
+    in order of first appearance.
+    """
+    names_arr = np.array([nm.strip() for nm in names])  # strip padding
+    keys, first_idx, counts = np.unique(names_arr, return_index=True, return_counts=True)
+    groups = {}
+    for k in np.argsort(first_idx):
+        c = int(counts[k])
+        groups[str(keys[k])] = {"count": c, "is_array": bool(c > 1 or idxs[first_idx[k]] != 0)}
     return groups
 
-def slice_values_into_groups(groups, values):
+def slice_values_into_groups(groups, values, order):
     """
-    Given groups (order implied by concatenation of all items), split a flat 'values'
-    list into per-variable arrays.
-    Returns dict: name -> np.array (shape (count,))
+    Given groups and their concatenation order, split a flat 'values'
+    array into per-variable arrays.
+    Returns dict: name -> np.ndarray view into values (shape (count,))
     """
+    values = np.asarray(values, dtype=float)
     out = {}
     pos = 0
     # We must follow the same concatenation order as in names/idxs
-    for name in groups_order:
+    for name in order:
         g = groups[name]
         m = g["count"]
-        arr = np.array(values[pos:pos+m], dtype=float)
+        out[name] = values[pos:pos+m]
         pos += m
-        out[name] = arr
     return out
 
 def read_section_header(f):
     nitems = read_int(f)
     names = read_names(f, nitems)
     idxs  = read_ints(f, nitems)
-    # preserve the order in which variables appear
+    # groups come in the order in which variables appear
     groups = group_structure(names, idxs)
-    order = []
-    seen = set()
-    for nm in names:
-        key = nm.strip()
-        if key not in seen:
-            order.append(key)
-            seen.add(key)
+    order = list(groups)
     return nitems, names, idxs, groups, order
 
-def read_fort10(path):
-    with open(path, "r") as f:
+CACHE_KEYS = ("key", "static", "order_s", "counts_s", "frames", "order_d", "counts_d",
+              "order_all", "nt_file")
+
+def cache_path(path):
+    return str(path) + ".cache.npz"
+
+def _stat_key(st):
+    return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+def load_cache(path, dtype=np.float64):
+    """
+    Return the parsed arrays saved next to `path`, or None if there is no
+    cache or it was written for a different size/mtime or frame dtype.
+    """
+    cpath = cache_path(path)
+    if not os.path.exists(cpath):
+        return None
+    try:
+        with np.load(cpath) as z:
+            if not set(CACHE_KEYS) <= set(z.files):
+                return None  # written by an older version of this script
+            if not np.array_equal(z["key"], _stat_key(os.stat(path))):
+                return None
+            if z["frames"].dtype != dtype:
+                return None
+            return {k: z[k] for k in z.files}
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+        return None  # damaged (e.g. empty or truncated) cache: re-parse
+
+def save_cache(path, parsed):
+    # parsed["key"] is the stat of the file as it was mapped, so a file
+    # that grew during the parse no longer matches and gets re-parsed.
+    # Best effort: a read-only run directory just means no cache.
+    # Written to a temp file in the same directory and renamed into place,
+    # so an interrupted or concurrent run never leaves a partial archive
+    cpath = cache_path(path)
+    try:
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(cpath) + ".",
+                                   dir=os.path.dirname(cpath) or ".")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            np.savez(fh, **parsed)
+        os.replace(tmp, cpath)
+    except OSError:
+        pass
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def select_frame_lines(buf, per_frame, Nt, spans):
+    """
+    Concatenate, frame by frame, the lines [a, b) of each (a, b) in `spans`,
+    for a buffer of Nt frames of per_frame lines. The skipped lines are only
+    located (one vectorized newline search), never converted.
+    """
+    nl = np.flatnonzero(np.frombuffer(buf, dtype=np.uint8) == ord("\n"))
+    # starts[k] is the byte offset of line k; the sentinel closes the last line
+    starts = np.concatenate(([0], nl + 1, [len(buf)]))
+    pieces = []
+    for t in range(Nt):
+        base = t * per_frame
+        for a, b in spans:
+            pieces.append(buf[starts[base + a]:starts[base + b]])
+    return b"".join(pieces)
+
+def parse_fort10(path, dtype=np.float64, want=None, profile_var=None):
+    """
+    Parse fort.10 into flat arrays: static values, the (Nt, per_frame)
+    frame matrix (in `dtype`), and the variable order/counts of both sections.
+    If `want` is a collection of names, only those dynamic variables are
+    converted; the frame matrix then holds just their columns.
+    If `profile_var` names a variable with more than one column, only the
+    last frame is converted, since its profile needs nothing else.
+    """
+    with MappedFile(path) as f:
         # --- Static section
         n_s, names_s, idxs_s, groups_s, order_s = read_section_header(f)
-        global groups_order
-        groups_order = []  # used by slice_values_into_groups
-        groups_order = [nm for nm in order_s]
         static_vals = read_floats(f, n_s)
-        static = slice_values_into_groups(groups_s, static_vals)
 
         # --- Dynamic section (header)
-        n_d, names_d, idxs_d, groups_d, order_d = read_section_header(f)
+        n_d, names_d, idxs_d, groups_d, order_all = read_section_header(f)
         # names and structure are fixed for all frames
-        order_d = [nm for nm in order_d]
-        # For slicing frames quickly, precompute how many values per frame:
+        order_d = order_all
+        # For slicing frames quickly, precompute how many values per frame
+        # and where each variable's columns start
         per_frame = n_d
+        gcounts_arr = np.array([groups_d[nm]["count"] for nm in order_all], dtype=np.intp)
+        offsets_arr = np.concatenate(([0], np.cumsum(gcounts_arr)))
 
-        # Collect frames until EOF
-        frames_flat = []
-        while True:
-            try:
-                vals = read_floats(f, per_frame)
-                frames_flat.append(vals)
-            except EOFError:
-                break
-        frames_flat = np.array(frames_flat, dtype=float)  # shape (Nt, per_frame)
-        Nt = frames_flat.shape[0]
-
-        # Build dict name -> array over time.
-        # First, compute counts per name
-        gcounts = {nm: groups_d[nm]["count"] for nm in order_d}
-        # offsets
-        offsets = {}
-        off = 0
-        for nm in order_d:
-            offsets[nm] = (off, off + gcounts[nm])
-            off += gcounts[nm]
-
-        dyn = {}
-        for nm in order_d:
-            a, b = offsets[nm]
-            data = frames_flat[:, a:b]  # (Nt, count)
-            # For scalars, squeeze to (Nt,)
-            if gcounts[nm] == 1:
-                dyn[nm] = data[:, 0]
-            else:
-                dyn[nm] = data  # (Nt, Nvar)
-        # Also pass static + some helpful metadata
-        meta = {
-            "order_static": order_s,
-            "order_dynamic": order_d,
-            "counts_dynamic": gcounts,
-            "Nt": Nt,
-        }
-        return static, dyn, meta
+        # Everything after the dynamic header is frame data, one value per line.
+        # First pass: count lines (memchr) to get the number of complete frames
+        buf = f.rest()
+        nlines = buf.count(b"\n") + (1 if buf and not buf.endswith(b"\n") else 0)
+        Nt = nlines // per_frame
+        # cut off the lines of a truncated trailing frame so they are never parsed
+        end = len(buf)
+        for _ in range(nlines - Nt * per_frame):
+            end = buf.rfind(b"\n", 0, end - 1) + 1
+        data = buf if end == len(buf) else buf[:end]
+        nt_file = Nt
+        # count > 1 matches how read_fort10 shapes dyn: count == 1 is a series
+        if Nt > 1 and profile_var in groups_d and groups_d[profile_var]["count"] > 1:
+            start = len(data)
+            for _ in range(per_frame):
+                start = data.rfind(b"\n", 0, start - 1) + 1
+            data = data[start:]
+            Nt = 1
+        if want is not None:
+            keep = [i for i, nm in enumerate(order_all) if nm in want]
+            if not keep:
+                raise KeyError(f"None of {sorted(want)} in fort.10. Available: {order_all[:15]} ...")
+            order_d = [order_all[i] for i in keep]
+            spans = [(int(offsets_arr[i]), int(offsets_arr[i + 1])) for i in keep]
+            data = select_frame_lines(data, per_frame, Nt, spans)
+            gcounts_arr = gcounts_arr[keep]
+            per_frame = int(gcounts_arr.sum())
+        # Second pass: parse exactly Nt frames into one array
+        vals = parse_float_lines(data, dtype)
+        Nt = vals.size // per_frame
+        frames_flat = vals[:Nt * per_frame].reshape(Nt, per_frame)
 
-def plot_profile(dyn, meta, varname):
-    var = varname.strip()
+    return {
+        "key": _stat_key(f.stat),
+        "static": static_vals,
+        "order_s": np.array(order_s),
+        "counts_s": np.array([groups_s[nm]["count"] for nm in order_s], dtype=np.int64),
+        "frames": frames_flat,
+        "order_d": np.array(order_d),
+        "counts_d": gcounts_arr.astype(np.int64),
+        "order_all": np.array(order_all),
+        "nt_file": np.int64(nt_file),
+    }
+
+def read_fort10(path, cache=True, dtype=np.float64, want=None, profile_var=None):
+    """
+    Read fort.10 into (static, dyn, meta). With `want`, dyn only holds those
+    variables. A valid cache is always used; otherwise, with caching on, the
+    whole file is parsed once so the cache serves later runs for any
+    variable, and only with cache=False is the parse limited to `want`
+    (and to the last frame for `profile_var`, see parse_fort10).
+    meta["Nt"] counts the frames in dyn, meta["Nt_file"] those in the file.
+    """
+    parsed = load_cache(path, dtype) if cache else None
+    if parsed is None:
+        if cache:
+            parsed = parse_fort10(path, dtype)
+            save_cache(path, parsed)
+        else:
+            parsed = parse_fort10(path, dtype, want=want, profile_var=profile_var)
+
+    order_s = [str(nm) for nm in parsed["order_s"]]
+    groups_s = {nm: {"count": int(c)} for nm, c in zip(order_s, parsed["counts_s"])}
+    static = slice_values_into_groups(groups_s, parsed["static"], order_s)
+
+    frame_order = [str(nm) for nm in parsed["order_d"]]
+    frames_flat = parsed["frames"]
+    Nt = frames_flat.shape[0]
+
+    # Build dict name -> array over time.
+    # First, compute counts per name of the columns in frames_flat
+    frame_counts = {nm: int(c) for nm, c in zip(frame_order, parsed["counts_d"])}
+    # One structured view of the frame matrix: fv[nm] is the (Nt, count)
+    # block of columns of nm, so no offsets need to be tracked by hand
+    frame_dt = np.dtype([(nm, frames_flat.dtype, (frame_counts[nm],)) for nm in frame_order])
+    fv = np.ascontiguousarray(frames_flat).view(frame_dt).reshape(-1)
+
+    # a cache holds every variable; dyn and meta only describe the wanted ones
+    order_d = [nm for nm in frame_order if want is None or nm in want]
+    gcounts = {nm: frame_counts[nm] for nm in order_d}
+
+    # Scalars are squeezed to (Nt,). Arrays are stored transposed, (Nvar, Nt),
+    # so a cell's time history arr[cell, :] is one contiguous row. Every entry
+    # is its own copy: no view keeps frames_flat alive once dyn is built
+    dyn = {nm: fv[nm][:, 0].copy() if gcounts[nm] == 1 else np.ascontiguousarray(fv[nm].T)
+           for nm in order_d}
+    # Also pass static + some helpful metadata
+    meta = {
+        "order_static": order_s,
+        "order_dynamic": order_d,
+        "counts_dynamic": gcounts,
+        "available_dynamic": [str(nm) for nm in parsed["order_all"]],
+        "Nt": Nt,
+        "Nt_file": int(parsed["nt_file"]),
+    }
+    return static, dyn, meta
+
+def profile_series(dyn, meta, var):
     if var not in dyn:
-        raise KeyError(f"Variable '{var}' not in fort.10. Available: {list(dyn.keys())[:15]} ...")
+        raise KeyError(f"Variable '{var}' not in fort.10. Available: {meta['available_dynamic'][:15]} ...")
     arr = dyn[var]
     t = dyn["TIME"]  # seconds
     # choose the last frame
     if arr.ndim == 1:
         # scalar series
-        y = arr
-        x = np.arange(arr.size)
-        plt.plot(x, y)
-        plt.xlabel("Frame")
-        plt.ylabel(var)
-        plt.title(f"{var} (scalar) vs frame")
+        return np.arange(arr.size), arr, "Frame", var, f"{var} (scalar) vs frame"
+    prof = arr[:, -1]   # over space, last time
+    xcoord = dyn.get("XC", None)
+    if isinstance(xcoord, np.ndarray) and xcoord.ndim == 2 and xcoord.shape[0] == prof.size:
+        x, xlabel = xcoord[:, -1], "x (cm)"
     else:
-        prof = arr[-1, :]   # last time, over space
-        xcoord = dyn.get("XC", None)
-        if isinstance(xcoord, np.ndarray) and xcoord.ndim == 2 and xcoord.shape[1] == prof.size:
-            x = xcoord[-1, :]
-            plt.plot(x, prof)
-            plt.xlabel("x (cm)")
-        else:
-            plt.plot(np.arange(prof.size), prof)
-            plt.xlabel("cell index")
-        ylabel = f"{var} (eV)" if var in ("TE","TI","TR") else var
-        plt.ylabel(ylabel)
-        plt.title(f"{var} profile at t = {t[-1]:.3e} s")
+        x, xlabel = np.arange(prof.size), "cell index"
+    ylabel = f"{var} (eV)" if var in ("TE","TI","TR") else var
+    return x, prof, xlabel, ylabel, f"{var} profile at t = {t[-1]:.3e} s"
 
-def plot_trace(dyn, meta, varname, cell):
-    var = varname.strip()
+def trace_series(dyn, meta, var, cell):
     if var not in dyn:
         raise KeyError(f"Variable '{var}' not in fort.10.")
     arr = dyn[var]
     t = dyn["TIME"]  # seconds
     if arr.ndim == 1:
         # scalar series
-        plt.plot(t, arr)
-        plt.xlabel("time (s)")
-        plt.ylabel(var)
-        plt.title(f"{var} vs time")
-    else:
-        if cell is None:
-            cell = arr.shape[1] // 2
-        if not (0 <= cell < arr.shape[1]):
-            raise IndexError(f"Cell {cell} out of range [0..{arr.shape[1]-1}]")
-        plt.plot(t, arr[:, cell])
-        ylabel = f"{var} (eV)" if var in ("TE","TI","TR") else var
-        plt.xlabel("time (s)")
-        plt.ylabel(ylabel)
-        plt.title(f"{var} at cell {cell} vs time")
+        return t, arr, "time (s)", var, f"{var} vs time"
+    if cell is None:
+        cell = arr.shape[0] // 2
+    if not (0 <= cell < arr.shape[0]):
+        raise IndexError(f"Cell {cell} out of range [0..{arr.shape[0]-1}]")
+    ylabel = f"{var} (eV)" if var in ("TE","TI","TR") else var
+    return t, arr[cell, :], "time (s)", ylabel, f"{var} at cell {cell} vs time"
+
+def _plot(x, y, xlabel, ylabel, title):
+    import matplotlib.pyplot as plt
+    plt.plot(x, y)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+
+def plot_profile(dyn, meta, varname):
+    var = varname.strip()
+    _plot(*profile_series(dyn, meta, var))
+
+def plot_trace(dyn, meta, varname, cell):
+    var = varname.strip()
+    _plot(*trace_series(dyn, meta, var, cell))
 
 def main():
     ap = argparse.ArgumentParser()
@@ -215,9 +403,23 @@ def main():
     ap.add_argument("mode", choices=["profile","trace"], help="plot mode")
     ap.add_argument("var", help="variable name (e.g., TI, TE, R, X)")
     ap.add_argument("--cell", type=int, default=None, help="cell index for 'trace' mode")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="always re-parse, do not read or write <fort10>.cache.npz")
+    ap.add_argument("--dtype", choices=["f32","f64"], default="f32",
+                    help="float type of the frame data (f32 is plenty for plotting)")
     args = ap.parse_args()
 
-    static, dyn, meta = read_fort10(args.fort10)
+    dtype = np.float32 if args.dtype == "f32" else np.float64
+    # only the plotted variable and its axes are needed; XC only for profiles
+    want = {args.var.strip(), "TIME"}
+    if args.mode == "profile":
+        want.add("XC")
+    # a profile of an array variable only reads its last frame
+    profile_var = args.var.strip() if args.mode == "profile" else None
+    static, dyn, meta = read_fort10(args.fort10, cache=not args.no_cache, dtype=dtype,
+                                    want=want, profile_var=profile_var)
+
+    import matplotlib.pyplot as plt
 
     plt.figure()
     if args.mode == "profile":